@@ -4,9 +4,113 @@
 import sys
 import os
 import re
-import xml.etree.ElementTree as ET
+try:
+    from lxml import etree as ET  # Faster C parser, used when installed
+    # Caption files are untrusted input; older lxml versions resolve external
+    # entities by default, which would leak local files into the SRT (XXE)
+    _XML_PARSE_OPTIONS = {'resolve_entities': False, 'no_network': True}
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _XML_PARSE_OPTIONS = {}
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 import shutil
+import codecs
+
+# Timestamp patterns
+# All TXT timestamp line formats in one pattern, so each line is scanned once.
+# The named group that matched tells which format was found; the start and
+# end times are the two groups that follow it.
+_TS_ANY = re.compile(
+    # Format 1-3: "00:00:00,344 --> 00:00:07,297" with -->, –> or - separators
+    r'(?P<std>(\d+:?\d*:?\d*[,\.:]\d*)\s*(?:-->|->|–>|-)\s*(\d+:?\d*:?\d*[,\.:]\d*))'
+    # Format 4: "0:00:01.000,0:00:07.160"
+    r'|(?P<comma>^(\d+:?\d*:?\d*[,\.:]\d*)\s*,\s*(\d+:?\d*:?\d*[,\.:]\d*)$)'
+    # Format 5: just a start time "00:00:00" or "0:00:01.160"
+    r'|(?P<start>^(\d+:?\d*:?\d*[,\.:]*\d*)$)'
+    # Format 6: colon milliseconds "00:00:00:00 - 00:00:14:22"
+    r'|(?P<colon_ms>(\d+:\d+:\d+:\d+)\s*(?:-->|->|–>|-)\s*(\d+:\d+:\d+:\d+))'
+    # Format 7: simplified time "0:01:"
+    r'|(?P<short>^(\d+:\d+):$)'
+)
+_TS_LINE = re.compile(r'^\d+:?\d*:?\d*[,\.:]\d*(?:,|\s*(?:-->|->|–>|-))\s*\d+:?\d*:?\d*[,\.:]\d*$|^\d+:?\d*:?\d*[,\.:]*\d*$')
+# SBV timestamps with the hour, the ":MM:SS" part and the milliseconds of both times
+_TS_SBV_PARTS = re.compile(r'(\d+)(:\d+:\d+)\.(\d+),(\d+)(:\d+:\d+)\.(\d+)')
+_TS_VTT_ARROW = re.compile(r'(\d+:\d+:\d+,\d+)\s*-->\s*(\d+:\d+:\d+,\d+)')
+_TS_VTT_CUE = re.compile(r'\d+:\d+:\d+[,\.]\d+\s*-->')
+_TS_HMS = re.compile(r'\d+:\d+:\d+$')
+_TS_PARTS = re.compile(r'(?:(?:(?P<h>\d*):)?(?P<m>\d*):)?(?P<s>\d*)(?:[,:](?P<ms>\d*))?')
+_COLON_MS = re.compile(r'(\d+:\d+:\d+):(\d+)')
+_HAS_TIME = re.compile(r'\d+:\d+')
+_NUM_LINE = re.compile(r'^\d+$')
+
+# Content signatures of each caption format, named by their file extension
+_SNIFF = re.compile(
+    rb'(?P<rtf>\{\\rtf)'
+    rb'|(?P<vtt>WEBVTT)'
+    rb'|(?P<xml><\?xml|<tt[\s>])'
+    rb'|(?P<sbv>\d+:\d+:\d+\.\d+,\d+:\d+:\d+\.\d+)'
+)
+
+# VTT patterns
+_VTT_TIME_LONG = re.compile(r'(\d+:\d+:\d+)\.(\d+)')
+_VTT_TIME_SHORT = re.compile(r'(\d+):(\d+)\.(\d+)')
+
+# XML time patterns
+# All XML time formats in one pattern; the last named group that matched
+# tells which format was found
+_XML_TIME = re.compile(
+    # HH:MM:SS.mmm or HH:MM:SS:mmm
+    r'(?P<h>\d+):(?P<m>\d+):(?P<s>\d+)[\.:](?P<ms>\d+)'
+    # MM:SS.mmm
+    r'|(?P<m2>\d+):(?P<s2>\d+)[\.:](?P<ms2>\d+)'
+    # Time in seconds (float)
+    r'|(?P<sec>\d+\.\d+)s?'
+)
+
+# RTF markup, stripped in a single pass by _strip_rtf_token
+_RTF_TOKEN = re.compile(
+    r'\\u(?P<unicode>-?[0-9]+) ?\??'  # Unicode escape "\u233?" or "\u-3913 " (signed 16-bit)
+    r'|\\\'[0-9a-f]{2}'  # Hex escape "\'e9"
+    r'|\{(?!\\rtf)[^{}]*\}'  # Innermost group (font table, color table, ...), not the document itself
+    r'|[\{\}]'
+    r'|\\[\-*]'  # Control symbols
+    r'|(?P<space>(?:\s|\\\n|\\(?!u-?[0-9])[a-zA-Z0-9]+(?:-?[0-9]+)?[ ]?)+)'  # Control words and whitespace
+)
+
+# UTF-16 surrogates left by \uN escapes, joined into characters after the markup pass
+_SURROGATES = re.compile('[\ud800-\udfff]+')
+
+# Timestamp pairs in RTF text; the named group that matched tells which format
+# was found, and the start and end times are the two groups that follow it.
+# A match never starts inside a run of digits, which would otherwise be retried
+# at every digit of the run (quadratic on long numbers).
+_TS_RTF = re.compile(
+    r'(?<!\d)(?:'
+    # Standard format "00:00:01,000 --> 00:00:03,000" with -->, ->, –> or - separators
+    r'(?P<arrow>(\d+:\d+:\d+[,\.]\d+)\s*(?:-->|->|–>|-)\s*(\d+:\d+:\d+[,\.]\d+))'
+    # Simple time range "00:00:01 - 00:00:03"
+    r'|(?P<range>(\d+:\d+:\d+)[^0-9:]*(\d+:\d+:\d+))'
+    # SBV format "0:00:01.000,0:00:07.160"
+    r'|(?P<sbv>(\d+:\d+:\d+\.\d+),(\d+:\d+:\d+\.\d+))'
+    r')'
+)
+
+# Transcript segmentation patterns
+_SPEAKER_SPLIT = re.compile(r'\s*(?:[A-Z][a-z]+:|\[?[A-Z][a-z]+\]?:|\([A-Z][a-z]+\):)\s*')
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+
+# Byte order marks and the encodings they select. The UTF-32 marks come first
+# because the UTF-32 LE mark starts with the UTF-16 LE one.
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
 
 def convert_to_srt(input_file, output_file=None):
     """Convert various caption formats to SRT format"""
@@ -15,91 +119,78 @@ def convert_to_srt(input_file, output_file=None):
         return False
     
     # Determine file type by extension
-    _, ext = os.path.splitext(input_file)
+    base, ext = os.path.splitext(input_file)
     ext = ext.lower()
     
     # Set output file name if not provided
     if not output_file:
-        output_file = os.path.splitext(input_file)[0] + '.srt'
+        output_file = base + '.srt'
     
     try:
         result = False
         
-        # Special handling for TXT files with specific timestamp format
-        if ext == '.txt':
-            # First check if file has the special format with "0:00:01.000,0:00:07.160" timestamps
-            # We'll use a more robust approach to handle special characters
-            with open(input_file, 'rb') as f:
-                content = f.read(1000)  # Read the first 1000 bytes
-            
-            try:
-                # Try to decode the content to check for timestamp pattern
-                content_str = content.decode('utf-8', errors='ignore')
-                if re.search(r'\d+:\d+:\d+\.\d+,\d+:\d+:\d+\.\d+', content_str):
-                    print(f"Detected special timestamp format in {input_file}, using special TXT converter...")
-                    result = convert_special_txt_format(input_file, output_file)
-                    if result and is_srt_valid(output_file):
-                        print(f"Successfully converted {input_file} to {output_file}")
-                        return True
-            except:
-                pass  # Ignore any decoding errors here, we'll try other methods
+        if ext not in _DISPATCH and ext != '.srt':
+            print(f"Error: Unsupported file format '{ext}'")
+            return False
         
-        # First attempt: try standard conversion based on file extension
-        if ext == '.rtf':
-            result = convert_rtf_to_srt(input_file, output_file)
-        elif ext == '.txt':
-            result = convert_txt_to_srt(input_file, output_file)
-        elif ext == '.vtt':
-            result = convert_vtt_to_srt(input_file, output_file)
-        elif ext == '.xml':
-            result = convert_xml_to_srt(input_file, output_file)
-        elif ext == '.sbv':
-            result = convert_sbv_to_srt(input_file, output_file)
-        elif ext == '.srt':
+        # Pick the converter from the content of the file, so a file whose extension
+        # doesn't match its format isn't run through every converter. The extension
+        # is only used when the content has no recognizable signature.
+        detected = _sniff_format(input_file) if ext != '.srt' else None
+        fmt = detected or ext
+        converter = None
+        
+        if ext == '.srt':
             # Just copy the file
-            shutil.copy2(input_file, output_file)
-            result = True
+            _copy_file(input_file, output_file)
+            result = is_srt_valid(output_file)
+        elif fmt == '.sbv' and ext == '.txt':
+            # TXT file with the special format with "0:00:01.000,0:00:07.160" timestamps
+            print(f"Detected special timestamp format in {input_file}, using special TXT converter...")
+            converter = convert_special_txt_format
         else:
-            print(f"Error: Unsupported file format '{ext}'")
-            return False
+            converter = _DISPATCH.get(fmt)
         
-        # Validate the result
-        if result and is_srt_valid(output_file):
+        # Converters already run on this file, skipped by the later attempts
+        tried = {converter}
+        
+        # First attempt: the converter for the detected format. Converters return the
+        # number of subtitles they wrote, so the output doesn't have to be re-read to
+        # check that it is a valid SRT file.
+        if converter:
+            result = converter(input_file, output_file)
+        
+        if result:
             print(f"Successfully converted {input_file} to {output_file}")
             return True
         
         # Second attempt: if first conversion failed, try with special TXT converter 
         # for files with specific timestamp format
-        if ext == '.txt' and (not result or not is_srt_valid(output_file)):
+        if ext == '.txt' and convert_special_txt_format not in tried:
+            tried.add(convert_special_txt_format)
             try:
                 print(f"Trying special TXT format converter...")
                 result = convert_special_txt_format(input_file, output_file)
-                if result and is_srt_valid(output_file):
+                if result:
                     print(f"Successfully converted {input_file} using special TXT format converter")
                     return True
             except Exception as e:
                 print(f"Error with special TXT format converter: {str(e)}")
         
         # Third attempt: try with other converters as fallback
-        if not result or not is_srt_valid(output_file):
+        if not result:
             print(f"Standard conversion failed for {input_file}, trying alternative methods...")
             
             # Try all converters in sequence until one succeeds
-            converters = [
-                ('TXT converter', convert_txt_to_srt),
-                ('VTT converter', convert_vtt_to_srt),
-                ('SBV converter', convert_sbv_to_srt),
-                ('RTF converter', convert_rtf_to_srt)
-            ]
-            
-            for converter_name, converter_func in converters:
-                if converter_func.__name__ == f"convert_{ext[1:]}_to_srt":
-                    continue  # Skip the converter we already tried
+            for converter_name, converter_func in _FALLBACK_ORDER:
+                if converter_func in tried:
+                    continue  # Skip the converters we already tried
+                tried.add(converter_func)
                 
                 try:
                     print(f"Trying {converter_name}...")
                     result = converter_func(input_file, output_file)
-                    if result and is_srt_valid(output_file):
+                    if result:
                         print(f"Successfully converted {input_file} using {converter_name}")
                         return True
                 except Exception as e:
@@ -113,7 +204,7 @@ def convert_to_srt(input_file, output_file=None):
                 
                 if len(text) > 100:  # If there's substantial text
                     result = convert_long_text_to_srt(text, output_file)
-                    if result and is_srt_valid(output_file):
+                    if result:
                         print(f"Successfully converted {input_file} using plain text extraction")
                         return True
             except Exception as e:
@@ -127,11 +218,45 @@ def convert_to_srt(input_file, output_file=None):
         print(f"Error converting {input_file}: {str(e)}")
         return False
 
+def _copy_file(src, dst):
+    """Copy an SRT file as-is, letting the kernel move the data where it can"""
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src} and {dst} are the same file")
+    
+    # os.copy_file_range is only available on Linux with Python 3.8+
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as s, open(dst, 'wb') as d:
+                remaining = os.fstat(s.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(s.fileno(), d.fileno(), remaining)
+                    if not copied:
+                        break
+                    remaining -= copied
+            # copy_file_range returns 0 on filesystems it cannot handle, so finish
+            # any short copy the regular way
+            if remaining <= 0:
+                return
+        except OSError:
+            pass  # Not supported for these files, fall back to a regular copy
+    
+    shutil.copyfile(src, dst)
+
+def _sniff_format(input_file):
+    """Detect the caption format from the first 4 KB of a file, or None if unknown"""
+    with open(input_file, 'rb') as f:
+        head = f.read(4096)
+    
+    match = _SNIFF.search(head)
+    return '.' + match.lastgroup if match else None
+
 def is_srt_valid(srt_file):
     """Check if SRT file is valid by verifying it has content and proper structure"""
     try:
         with open(srt_file, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read().strip()
+            # The first subtitle entry is at the top of the file, so only the
+            # start of it needs to be read
+            content = f.read(4096).strip()
             
             # Check if file is empty
             if not content:
@@ -149,7 +274,7 @@ def is_srt_valid(srt_file):
             for line in lines:
                 if '-->' in line:
                     has_timestamp = True
-                if re.match(r'^\d+$', line.strip()):
+                if _NUM_LINE.match(line.strip()):
                     has_number = True
                 if has_timestamp and has_number:
                     return True
@@ -158,145 +283,170 @@ def is_srt_valid(srt_file):
     except Exception:
         return False
 
+@contextmanager
+def _atomic_output(output_file):
+    """Write an SRT file under a temporary name and move it into place when complete"""
+    # The temporary file sits next to the output so os.replace stays on one file
+    # system; a failed conversion never leaves a half-written output behind
+    temp_file = f"{output_file}.{os.getpid()}.tmp"
+    try:
+        # Cues are written one at a time, so give them a larger buffer to collect in
+        with open(temp_file, 'w', encoding='utf-8', buffering=65536) as out:
+            yield out
+        os.replace(temp_file, output_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+class _LineReader:
+    """Iterate over the stripped lines of a file with one line of lookahead"""
+    
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._advance()
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        line = self._next
+        if line is None:
+            raise StopIteration
+        self._advance()
+        return line
+    
+    def _advance(self):
+        """Read and strip the next line once, so callers never strip it again"""
+        line = next(self._lines, None)
+        self._next = line.strip() if line is not None else None
+    
+    def peek(self):
+        """Return the next line without consuming it, or None at the end of the file"""
+        return self._next
+
+def _read_cue_text(reader, is_timestamp):
+    """Consume the text lines of a cue, stopping at an empty line or the next timestamp"""
+    subtitle_lines = []
+    while reader.peek() is not None:
+        line = reader.peek()
+        if not line or is_timestamp(line):
+            break
+        subtitle_lines.append(line)
+        next(reader)
+    return subtitle_lines
+
+def _strip_rtf_token(match):
+    """Replacement for a single RTF token matched by _RTF_TOKEN"""
+    if match.group('unicode'):
+        # \uN is a signed 16-bit value; anything beyond Unicode is dropped
+        code = int(match.group('unicode'))
+        if code < 0:
+            code += 65536
+        return chr(code) if code <= 0x10FFFF else ''
+    if match.group('space'):
+        return ' '
+    return ''
+
+def _join_surrogates(match):
+    """Combine a run of UTF-16 surrogates into characters, replacing unpaired ones"""
+    return match.group().encode('utf-16-le', 'surrogatepass').decode('utf-16-le', 'replace')
+
 def convert_rtf_to_srt(input_file, output_file):
     """Convert RTF to SRT format"""
     # Read the RTF file content
     with open(input_file, 'r', encoding='utf-8', errors='ignore') as f:
         content = f.read()
     
-    # More robust RTF stripping
-    # Remove all RTF control sequences
-    content = re.sub(r'\\[a-zA-Z0-9]+(-?[0-9]+)?[ ]?', ' ', content)
-    
-    # Remove RTF curly braces, header, and other control characters
-    content = re.sub(r'\{\\rtf[^}]*\}', '', content)
-    content = re.sub(r'\{[^}]*\}', '', content)
-    content = re.sub(r'[\{\}]', '', content)
-    content = re.sub(r'\\\n', '\n', content)
-    content = re.sub(r'\\[a-z0-9\-*]+', '', content)
-    
-    # Replace Unicode escape sequences
-    content = re.sub(r'\\u([0-9]+)\?', lambda m: chr(int(m.group(1))), content)
-    
-    # Remove special characters and normalize whitespace
-    content = re.sub(r'\\\'[0-9a-f]{2}', '', content)
-    content = re.sub(r'\s+', ' ', content)
-    
-    # Split into lines for processing
-    lines = content.split('\\')
-    cleaned_lines = []
-    
-    # Clean up the lines
-    for line in lines:
-        line = line.strip()
-        if line and not line.startswith('\\') and not line.startswith('{') and not line.startswith('}'):
-            # Detect and extract timestamp patterns
-            for timestamp_format in [
-                r'(\d+:\d+:\d+[,\.]\d+)\s*(?:-->|->|–>|-)\s*(\d+:\d+:\d+[,\.]\d+)', # Standard format
-                r'(\d+:\d+:\d+)[^0-9:]*(\d+:\d+:\d+)',  # Simple time range
-                r'(\d+:\d+:\d+\.\d+),(\d+:\d+:\d+\.\d+)'  # SBV format
-            ]:
-                timestamp_match = re.search(timestamp_format, line)
-                if timestamp_match:
-                    start_time = timestamp_match.group(1)
-                    end_time = timestamp_match.group(2)
-                    cleaned_lines.append(f"{start_time} --> {end_time}")
-                    
-                    # Extract the text after the timestamp
-                    text = line[timestamp_match.end():].strip()
-                    if text:
-                        cleaned_lines.append(text)
-                    break
-            else:
-                # No timestamp found, consider it as subtitle text
-                cleaned_lines.append(line)
+    # Strip RTF control words, groups and braces, decode Unicode escapes and
+    # normalize whitespace in one pass over the content
+    content = _RTF_TOKEN.sub(_strip_rtf_token, content)
     
-    # Join the cleaned lines and convert using text conversion
-    cleaned_content = '\n'.join(cleaned_lines)
+    # Characters outside the BMP (emoji) are written as two \uN surrogate escapes
+    content = _SURROGATES.sub(_join_surrogates, content)
     
-    # Write to a temporary file
+    # Find every timestamp pair in one pass over the content. The text of each
+    # subtitle runs from its timestamps to the next pair, and is streamed to a
+    # temporary file for the TXT converter.
     temp_file = output_file + '.temp.txt'
-    with open(temp_file, 'w', encoding='utf-8') as f:
-        f.write(cleaned_content)
-    
-    # Use the TXT converter on the cleaned content
-    result = convert_txt_to_srt(temp_file, output_file)
-    
-    # Remove the temporary file
     try:
-        os.remove(temp_file)
-    except:
-        pass
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            matches = _TS_RTF.finditer(content)
+            timestamp_match = next(matches, None)
+            while timestamp_match:
+                next_match = next(matches, None)
+                
+                start_time = timestamp_match.group(timestamp_match.lastindex + 1)
+                end_time = timestamp_match.group(timestamp_match.lastindex + 2)
+                f.write(f"{start_time} --> {end_time}\n")
+                
+                # Extract the text after the timestamp, one line per leftover RTF break
+                text_end = next_match.start() if next_match else len(content)
+                for line in content[timestamp_match.end():text_end].split('\\'):
+                    # Whitespace on both sides of a removed group is kept by the markup
+                    # pass, so collapse it again here
+                    line = ' '.join(line.split())
+                    if line:
+                        f.write(f"{line}\n")
+                
+                timestamp_match = next_match
+        
+        # Use the TXT converter on the cleaned content
+        result = convert_txt_to_srt(temp_file, output_file)
+    finally:
+        # Remove the temporary file, even if the conversion failed
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
     
     return result
 
 def convert_txt_to_srt(input_file, output_file):
     """Convert TXT to SRT format"""
-    with open(input_file, 'r', encoding='utf-8', errors='ignore') as f:
-        lines = f.readlines()
-    
-    # Check if this is a single long line transcript with no timestamps
-    if len(lines) == 1 and len(lines[0]) > 1000 and not re.search(r'\d+:\d+', lines[0]):
-        return convert_long_text_to_srt(lines[0], output_file)
-    
-    srt_content = []
     counter = 1
-    i = 0
     
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip empty lines
-        if not line:
-            i += 1
-            continue
-        
-        # Check for various timestamp formats
-        
-        # Format 1: Standard SRT-like with arrow "00:00:00,344 --> 00:00:07,297"
-        # Format 2: Using en-dash "00:00:00,344 –> 00:00:07,297"
-        # Format 3: Using hyphen "00:00:00,344 - 00:00:07,297"
-        timestamp_match = re.search(r'(\d+:?\d*:?\d*[,\.:]\d*)\s*(?:-->|->|–>|-)\s*(\d+:?\d*:?\d*[,\.:]\d*)', line)
-        
-        # Format 4: Start and end times separated by comma without spaces "0:00:01.000,0:00:07.160"
-        if not timestamp_match:
-            timestamp_match = re.search(r'^(\d+:?\d*:?\d*[,\.:]\d*)\s*,\s*(\d+:?\d*:?\d*[,\.:]\d*)$', line)
-            
-        # Format 5: Just start time "00:00:00" or "0:00:01.160"
-        if not timestamp_match:
-            timestamp_match = re.search(r'^(\d+:?\d*:?\d*[,\.:]*\d*)$', line)
-            
-            if timestamp_match:
-                start_time = timestamp_match.group(1)
-                # Set a default end time 5 seconds later if only start time is provided
-                end_time = None
-        else:
-            start_time = timestamp_match.group(1)
-            end_time = timestamp_match.group(2)
-            
-        # Format 6: With colon for milliseconds "00:00:00:00 - 00:00:14:22"
-        if not timestamp_match:
-            timestamp_match = re.search(r'(\d+:\d+:\d+:\d+)\s*(?:-->|->|–>|-)\s*(\d+:\d+:\d+:\d+)', line)
-            if timestamp_match:
-                start_time = timestamp_match.group(1)
-                end_time = timestamp_match.group(2)
-                # Convert colon milliseconds to comma format
-                start_time = re.sub(r'(\d+:\d+:\d+):(\d+)', r'\1,\2', start_time)
-                end_time = re.sub(r'(\d+:\d+:\d+):(\d+)', r'\1,\2', end_time)
-        
-        # Format 7: Simplified time format "0:01:"
-        if not timestamp_match:
-            timestamp_match = re.search(r'^(\d+:\d+):$', line)
-            if timestamp_match:
-                time_part = timestamp_match.group(1)
-                # Expand to full timestamp format
-                if time_part.count(':') == 1:
-                    start_time = f"00:{time_part},000"
+    with open(input_file, 'r', encoding='utf-8', errors='ignore') as f:
+        reader = _LineReader(f)
+        
+        # Check if this is a single long line transcript with no timestamps
+        first_line = reader.peek()
+        if first_line is not None and len(first_line) > 1000 and not _HAS_TIME.search(first_line):
+            next(reader)
+            if reader.peek() is None:
+                return convert_long_text_to_srt(first_line, output_file)
+        
+        with _atomic_output(output_file) as out:
+            for line in reader:
+                # Skip empty lines
+                if not line:
+                    continue
+                
+                # Every timestamp format either starts the line with a digit or has a
+                # dash in its separator, so plain text lines skip the regex
+                if not (line[0].isdigit() or '-' in line or '–' in line):
+                    continue
+                
+                # Check for the supported timestamp formats in a single pass
+                timestamp_match = _TS_ANY.search(line)
+                if not timestamp_match:
+                    continue
+                
+                timestamp_format = timestamp_match.lastgroup
+                start_time = timestamp_match.group(timestamp_match.lastindex + 1)
                 end_time = None
-        
-        if timestamp_match:
-            # Normalize timestamps to SRT format (HH:MM:SS,mmm)
-            if start_time:
+                
+                if timestamp_format in ('std', 'comma', 'colon_ms'):
+                    end_time = timestamp_match.group(timestamp_match.lastindex + 2)
+                
+                if timestamp_format == 'colon_ms':
+                    # Convert colon milliseconds to comma format
+                    start_time = _COLON_MS.sub(r'\1,\2', start_time)
+                    end_time = _COLON_MS.sub(r'\1,\2', end_time)
+                elif timestamp_format == 'short':
+                    # Expand to full timestamp format
+                    start_time = f"00:{start_time},000"
+                
+                # Normalize timestamps to SRT format (HH:MM:SS,mmm)
                 start_time = normalize_timestamp(start_time)
                 
                 if end_time:
@@ -318,42 +468,27 @@ def convert_txt_to_srt(input_file, output_file):
                             if minutes >= 60:
                                 hours += minutes // 60
                                 minutes %= 60
-                                
+                        
                         end_time = f"{hours:02d}:{minutes:02d}:{seconds:02d},{millis:03d}"
                     else:
                         # If time format is too simple, just add 5 seconds to default end time
                         end_time = f"00:00:05,000"
                 
-                # Get the subtitle text
-                subtitle_lines = []
-                i += 1
-                
                 # Collect subtitle text until we encounter another timestamp or empty line
-                timestamp_pattern = r'^\d+:?\d*:?\d*[,\.:]\d*(?:,|\s*(?:-->|->|–>|-))\s*\d+:?\d*:?\d*[,\.:]\d*$|^\d+:?\d*:?\d*[,\.:]*\d*$'
-                while i < len(lines) and lines[i].strip() and not re.match(timestamp_pattern, lines[i].strip()):
-                    subtitle_lines.append(lines[i].strip())
-                    i += 1
+                subtitle_lines = _read_cue_text(reader, _TS_LINE.match)
                 
                 # If we don't have subtitle lines but the next line isn't a timestamp, it's probably the subtitle
-                if not subtitle_lines and i < len(lines) and not re.match(timestamp_pattern, lines[i].strip()):
-                    subtitle_lines.append(lines[i].strip())
-                    i += 1
+                next_line = reader.peek()
+                if not subtitle_lines and next_line is not None and not _TS_LINE.match(next_line):
+                    subtitle_lines.append(next(reader))
                 
-                if subtitle_lines:
-                    srt_content.append(f"{counter}")
-                    srt_content.append(f"{start_time} --> {end_time}")
-                    srt_content.extend(subtitle_lines)
-                    srt_content.append("")
+                # The next line may have been blank, so only count cues that have text
+                if any(subtitle_lines):
+                    text = '\n'.join(subtitle_lines)
+                    out.write(f"{counter}\n{start_time} --> {end_time}\n{text}\n\n")
                     counter += 1
-            else:
-                i += 1
-        else:
-            i += 1
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(srt_content))
-    
-    return True
+    return counter - 1
 
 def convert_long_text_to_srt(text, output_file):
     """Convert a single long text (like a transcript) to SRT format by breaking it into segments"""
@@ -365,13 +500,13 @@ def convert_long_text_to_srt(text, output_file):
     segments = []
     
     # First try to split by common speaker transition patterns
-    speaker_transitions = re.split(r'\s*(?:[A-Z][a-z]+:|\[?[A-Z][a-z]+\]?:|\([A-Z][a-z]+\):)\s*', text)
+    speaker_transitions = _SPEAKER_SPLIT.split(text)
     
     if len(speaker_transitions) > 3:  # If we found several speaker transitions
         segments = speaker_transitions
     else:
         # Otherwise split by sentence terminators
-        sentence_splits = re.split(r'(?<=[.!?])\s+', text)
+        sentence_splits = _SENTENCE_SPLIT.split(text)
         
         # Group sentences into reasonable segments (4-5 sentences per segment)
         segment_size = 3  # Number of sentences per segment
@@ -385,56 +520,52 @@ def convert_long_text_to_srt(text, output_file):
     
     # Create SRT content with estimated timestamps
     # Assume an average speaking rate of 150 words per minute (2.5 words per second)
-    srt_content = []
     counter = 1
     
     current_time_seconds = 0
     words_per_second = 2.5
     
-    for segment in segments:
-        words = len(segment.split())
-        duration = max(2, words / words_per_second)  # At least 2 seconds per segment
-        
-        # Calculate timestamps
-        start_time = format_timestamp(current_time_seconds)
-        current_time_seconds += duration
-        end_time = format_timestamp(current_time_seconds)
-        
-        # Add a small gap between segments
-        current_time_seconds += 0.25
-        
-        # Add to SRT content
-        srt_content.append(f"{counter}")
-        srt_content.append(f"{start_time} --> {end_time}")
-        
-        # Split segment into multiple lines if it's too long (more than 42 characters per line)
-        line_length = 42
-        if len(segment) > line_length:
-            words = segment.split()
-            lines = []
-            current_line = []
+    with _atomic_output(output_file) as out:
+        for segment in segments:
+            words = len(segment.split())
+            duration = max(2, words / words_per_second)  # At least 2 seconds per segment
             
-            for word in words:
-                if sum(len(w) for w in current_line) + len(current_line) + len(word) <= line_length:
-                    current_line.append(word)
-                else:
-                    lines.append(' '.join(current_line))
-                    current_line = [word]
+            # Calculate timestamps
+            start_time = format_timestamp(current_time_seconds)
+            current_time_seconds += duration
+            end_time = format_timestamp(current_time_seconds)
             
-            if current_line:
-                lines.append(' '.join(current_line))
+            # Add a small gap between segments
+            current_time_seconds += 0.25
             
-            srt_content.extend(lines)
-        else:
-            srt_content.append(segment)
-        
-        srt_content.append("")
-        counter += 1
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(srt_content))
+            # Split segment into multiple lines if it's too long (more than 42 characters per line)
+            line_length = 42
+            if len(segment) > line_length:
+                words = segment.split()
+                lines = []
+                current_line = []
+                current_length = 0  # Word lengths plus one separator per word
+                
+                for word in words:
+                    if current_length + len(word) <= line_length:
+                        current_line.append(word)
+                        current_length += len(word) + 1
+                    else:
+                        lines.append(' '.join(current_line))
+                        current_line = [word]
+                        current_length = len(word) + 1
+                
+                if current_line:
+                    lines.append(' '.join(current_line))
+                
+                text = '\n'.join(lines)
+            else:
+                text = segment
+            
+            out.write(f"{counter}\n{start_time} --> {end_time}\n{text}\n\n")
+            counter += 1
     
-    return True
+    return counter - 1
 
 def format_timestamp(seconds):
     """Format seconds as SRT timestamp (HH:MM:SS,mmm)"""
@@ -444,323 +575,300 @@ def format_timestamp(seconds):
     millis = int((seconds - int(seconds)) * 1000)
     return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
 
+@lru_cache(maxsize=8192)
 def normalize_timestamp(timestamp):
     """Normalize various timestamp formats to SRT format (HH:MM:SS,mmm)"""
     # Replace period with comma for milliseconds
     timestamp = timestamp.replace('.', ',')
     
-    # Count the number of time components
-    parts = re.split(r'[:,]', timestamp)
-    
-    if len(parts) == 1:  # Just seconds
-        seconds = int(parts[0])
-        return f"00:00:{seconds:02d},000"
-        
-    elif len(parts) == 2:  # MM:SS or SS,mmm
-        if ',' in timestamp:
-            seconds, millis = parts
-            return f"00:00:{int(seconds):02d},{millis.ljust(3, '0')[:3]}"
-        else:
-            minutes, seconds = parts
-            return f"00:{int(minutes):02d}:{int(seconds):02d},000"
-            
-    elif len(parts) == 3:  # HH:MM:SS or MM:SS,mmm
-        if ',' in timestamp:
-            minutes, seconds, millis = parts
-            return f"00:{int(minutes):02d}:{int(seconds):02d},{millis.ljust(3, '0')[:3]}"
-        else:
-            hours, minutes, seconds = parts
-            return f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d},000"
-            
-    elif len(parts) == 4:  # HH:MM:SS,mmm
-        hours, minutes, seconds, millis = parts
-        # Ensure proper formatting with leading zeros
-        return f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d},{millis.ljust(3, '0')[:3]}"
+    # Hours, minutes and milliseconds are optional: SS, SS,mmm, MM:SS,
+    # MM:SS,mmm, HH:MM:SS or HH:MM:SS,mmm (milliseconds may follow a colon)
+    match = _TS_PARTS.fullmatch(timestamp)
     
     # If we can't parse it, return as is
-    return timestamp
+    if not match:
+        return timestamp
+    
+    hours, minutes, seconds, millis = match.group('h', 'm', 's', 'ms')
+    hours = int(hours) if hours is not None else 0
+    minutes = int(minutes) if minutes is not None else 0
+    millis = (millis or '').ljust(3, '0')[:3]
+    return f"{hours:02d}:{minutes:02d}:{int(seconds):02d},{millis}"
 
+@lru_cache(maxsize=8192)
 def convert_timestamp(timestamp):
     """Convert various timestamp formats to SRT format (HH:MM:SS,mmm)"""
     # Basic handling for HH:MM:SS format
-    if re.match(r'\d+:\d+:\d+$', timestamp):
+    if _TS_HMS.match(timestamp):
         return timestamp + ",000"
     return timestamp
 
 def convert_vtt_to_srt(input_file, output_file):
     """Convert VTT to SRT format"""
-    with open(input_file, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-    
-    # Remove WebVTT header
-    content = re.sub(r'WEBVTT.*?(\r\n|\r|\n)(\r\n|\r|\n)', '', content)
-    
-    # Normalize different line ending styles
-    content = content.replace('\r\n', '\n').replace('\r', '\n')
-    
-    # VTT files can sometimes use comma instead of arrow (like txt files)
-    if ',' in content and not '-->' in content:
-        # Process like a TXT file with comma-separated timestamps
-        lines = content.split('\n')
-        return convert_txt_to_srt(input_file, output_file)
-    
-    # Convert timestamps in different formats
-    
-    # Format 1: Standard VTT format with hours: 00:00:00.000 --> 00:00:05.000
-    content = re.sub(r'(\d+):(\d+):(\d+)\.(\d+)', r'\1:\2:\3,\4', content)
-    
-    # Format 2: VTT format without hours: 00:00.000 --> 00:05.000
-    # Convert to standard SRT format with hours (00:00:00,000 --> 00:00:05,000)
-    content = re.sub(r'(\d+):(\d+)\.(\d+)', r'00:\1:\2,\3', content)
-    
-    # Process content line by line
-    lines = content.split('\n')
-    srt_content = []
     counter = 1
-    i = 0
     
-    while i < len(lines):
-        line = lines[i].strip()
+    # Read as text so universal newlines split lone-CR files and str.strip()
+    # removes Unicode whitespace; only cue timing lines are rewritten
+    with open(input_file, 'r', encoding='utf-8', errors='ignore') as f, \
+         _atomic_output(output_file) as out:
+        reader = _LineReader(f)
         
-        # Skip empty lines or notes
-        if not line or line.startswith("NOTE"):
-            i += 1
-            continue
-        
-        # Look for timestamp patterns (more flexible now)
-        timestamp_match = re.search(r'(\d+:\d+:\d+,\d+)\s*-->\s*(\d+:\d+:\d+,\d+)', line)
-        
-        if timestamp_match:
-            start_time = timestamp_match.group(1)
-            end_time = timestamp_match.group(2)
+        for line in reader:
+            # Skip empty lines, the WebVTT header and notes
+            if not line or line.startswith("NOTE"):
+                continue
             
-            # Get subtitle text (could be multiple lines)
-            subtitle_lines = []
-            i += 1
-            while i < len(lines) and lines[i].strip() and not re.search(r'\d+:\d+:\d+[,\.]\d+\s*-->', lines[i]):
-                subtitle_lines.append(lines[i].strip())
-                i += 1
+            # Look for timestamp patterns (more flexible now), skipping the regex
+            # for text lines that have no arrow
+            timestamp_match = '-->' in line and _TS_VTT_ARROW.search(_vtt_to_srt_times(line))
             
-            if subtitle_lines:
-                srt_content.append(f"{counter}")
-                srt_content.append(f"{start_time} --> {end_time}")
-                srt_content.extend(subtitle_lines)
-                srt_content.append("")
-                counter += 1
-        else:
-            i += 1
+            if timestamp_match:
+                start_time = timestamp_match.group(1)
+                end_time = timestamp_match.group(2)
+                
+                # Get subtitle text (could be multiple lines)
+                subtitle_lines = _read_cue_text(reader, _is_vtt_cue_timing)
+                
+                if subtitle_lines:
+                    text = '\n'.join(subtitle_lines)
+                    out.write(f"{counter}\n{start_time} --> {end_time}\n{text}\n\n")
+                    counter += 1
     
     # If no valid captions were found, try alternative parsing approaches
     if counter == 1:
         # Try processing as a text file with different timestamp formats
         return convert_txt_to_srt(input_file, output_file)
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(srt_content))
+    return counter - 1
+
+def _is_vtt_cue_timing(line):
+    """Check if a line starts a new VTT cue"""
+    return '-->' in line and _TS_VTT_CUE.search(_vtt_to_srt_times(line)) is not None
+
+def _vtt_to_srt_times(line):
+    """Rewrite VTT timestamps (HH:MM:SS.mmm and MM:SS.mmm) in a cue timing line to SRT format"""
+    # Only cue timing lines are rewritten, so times quoted in the subtitle text are
+    # kept as written. Both formats also need a '.' millisecond separator.
+    if '-->' not in line or '.' not in line:
+        return line
+    
+    # Format 1: Standard VTT format with hours: 00:00:00.000 --> 00:00:05.000
+    line = _VTT_TIME_LONG.sub(r'\1,\2', line)
     
-    return True
+    # Format 2: VTT format without hours: 00:00.000 --> 00:05.000
+    # Convert to standard SRT format with hours (00:00:00,000 --> 00:00:05,000)
+    return _VTT_TIME_SHORT.sub(r'00:\1:\2,\3', line)
 
 def convert_xml_to_srt(input_file, output_file):
     """Convert XML to SRT format"""
     try:
-        tree = ET.parse(input_file)
-        root = tree.getroot()
-        
         # Try to handle different XML caption formats (TTML, DFXP, etc.)
-        srt_content = []
         counter = 1
-        
-        # Look for common patterns in subtitle XML formats
-        subtitles = root.findall('.//p') or root.findall('.//subtitle') or root.findall('.//text')
-        
-        for subtitle in subtitles:
-            start_time = subtitle.get('begin') or subtitle.get('start')
-            end_time = subtitle.get('end') or subtitle.get('dur')
-            
-            if start_time and end_time:
-                # Convert time format if needed
-                start_time = convert_xml_time(start_time)
-                end_time = convert_xml_time(end_time)
+        subtitle_tag = None
+        
+        # Stream the document instead of building the whole tree first. Common patterns
+        # in subtitle XML formats are <p>, <subtitle> or <text> elements; the first of
+        # these tags to appear is used for the whole file. Tags are matched on their
+        # local name, so namespaced TTML ({http://www.w3.org/ns/ttml}p) is found too.
+        with _atomic_output(output_file) as out:
+            for event, subtitle in ET.iterparse(input_file, events=('start', 'end'), **_XML_PARSE_OPTIONS):
+                if event == 'start':
+                    if subtitle_tag is None and subtitle.tag.rpartition('}')[2] in ('p', 'subtitle', 'text'):
+                        subtitle_tag = subtitle.tag
+                    continue
                 
-                text = subtitle.text.strip() if subtitle.text else ""
+                if subtitle.tag != subtitle_tag:
+                    continue
                 
-                if text:
-                    srt_content.append(f"{counter}")
-                    srt_content.append(f"{start_time} --> {end_time}")
-                    srt_content.append(f"{text}")
-                    srt_content.append("")
-                    counter += 1
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(srt_content))
+                start_time = subtitle.get('begin') or subtitle.get('start')
+                end_time = subtitle.get('end') or subtitle.get('dur')
+                
+                if start_time and end_time:
+                    # Convert time format if needed
+                    start_time = convert_xml_time(start_time)
+                    end_time = convert_xml_time(end_time)
+                    
+                    text = subtitle.text.strip() if subtitle.text else ""
+                    
+                    if text:
+                        out.write(f"{counter}\n{start_time} --> {end_time}\n{text}\n\n")
+                        counter += 1
+                
+                # Free the element once its cue has been written
+                subtitle.clear()
         
-        return True
+        return counter - 1
     except ET.ParseError:
         print(f"Error: Unable to parse XML file {input_file}")
         return False
 
 def convert_sbv_to_srt(input_file, output_file):
     """Convert SBV (YouTube's Simple SubRip format) to SRT format"""
-    with open(input_file, 'r', encoding='utf-8', errors='ignore') as f:
-        lines = f.readlines()
-    
-    srt_content = []
     counter = 1
-    i = 0
     
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip empty lines
-        if not line:
-            i += 1
-            continue
+    # Read in text mode so lines split on any newline style and Unicode
+    # whitespace is stripped from the cue text
+    with open(input_file, 'r', encoding='utf-8', errors='ignore') as f, \
+         _atomic_output(output_file) as out:
+        reader = _LineReader(f)
         
-        # Look for timestamp pattern like "0:00:00.000,0:00:05.000"
-        timestamp_match = re.search(r'(\d+:\d+:\d+\.\d+),(\d+:\d+:\d+\.\d+)', line)
-        
-        if timestamp_match:
-            # Convert timestamps from HH:MM:SS.mmm to HH:MM:SS,mmm format
-            start_time = timestamp_match.group(1).replace('.', ',')
-            end_time = timestamp_match.group(2).replace('.', ',')
-            
-            # Ensure proper hour formatting (0:00:00 -> 00:00:00)
-            if start_time.count(':') == 2 and start_time[1] == ':':
-                start_time = '0' + start_time
-            if end_time.count(':') == 2 and end_time[1] == ':':
-                end_time = '0' + end_time
+        for line in reader:
+            # Skip empty lines
+            if not line:
+                continue
             
-            # Get the subtitle text (could be multiple lines until next timestamp)
-            subtitle_lines = []
-            i += 1
-            while i < len(lines) and lines[i].strip() and not re.search(r'\d+:\d+:\d+\.\d+,\d+:\d+:\d+\.\d+', lines[i]):
-                subtitle_lines.append(lines[i].strip())
-                i += 1
+            # Look for timestamp pattern like "0:00:00.000,0:00:05.000"
+            timestamp_match = _TS_SBV_PARTS.search(line)
             
-            if subtitle_lines:
-                srt_content.append(f"{counter}")
-                srt_content.append(f"{start_time} --> {end_time}")
-                srt_content.extend(subtitle_lines)
-                srt_content.append("")
-                counter += 1
-        else:
-            i += 1
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(srt_content))
+            if timestamp_match:
+                # Convert timestamps from H:MM:SS.mmm to HH:MM:SS,mmm format,
+                # zero-padding only the hour (0:00:00 -> 00:00:00)
+                start_h, start_rest, start_ms, end_h, end_rest, end_ms = timestamp_match.groups()
+                start_time = f"{start_h.zfill(2)}{start_rest},{start_ms}"
+                end_time = f"{end_h.zfill(2)}{end_rest},{end_ms}"
+                
+                # Get the subtitle text (could be multiple lines until next timestamp)
+                subtitle_lines = _read_cue_text(reader, _TS_SBV_PARTS.search)
+                
+                if subtitle_lines:
+                    text = '\n'.join(subtitle_lines)
+                    out.write(f"{counter}\n{start_time} --> {end_time}\n{text}\n\n")
+                    counter += 1
     
-    return True
+    return counter - 1
 
+@lru_cache(maxsize=8192)
 def convert_xml_time(timestamp):
     """Convert XML timestamp formats to SRT format (HH:MM:SS,mmm)"""
-    # Handle common XML time formats
+    # Handle common XML time formats, telling them apart with a single match
+    time_match = _XML_TIME.match(timestamp)
+    if not time_match:
+        return timestamp
+    
+    time_format = time_match.lastgroup
     
     # Format: HH:MM:SS.mmm or HH:MM:SS:mmm
-    time_match = re.match(r'(\d+):(\d+):(\d+)[\.:](\d+)', timestamp)
-    if time_match:
-        hours, minutes, seconds, millis = time_match.groups()
+    if time_format == 'ms':
+        hours, minutes, seconds, millis = time_match.group('h', 'm', 's', 'ms')
         # Ensure milliseconds are 3 digits
         millis = millis.ljust(3, '0')[:3]
         return f"{hours}:{minutes}:{seconds},{millis}"
     
     # Format: MM:SS.mmm
-    time_match = re.match(r'(\d+):(\d+)[\.:](\d+)', timestamp)
-    if time_match:
-        minutes, seconds, millis = time_match.groups()
+    if time_format == 'ms2':
+        minutes, seconds, millis = time_match.group('m2', 's2', 'ms2')
         # Ensure milliseconds are 3 digits
         millis = millis.ljust(3, '0')[:3]
         return f"00:{minutes}:{seconds},{millis}"
     
-    # Format: time in seconds (float)
-    time_match = re.match(r'(\d+\.\d+)s?', timestamp)
-    if time_match:
-        total_seconds = float(time_match.group(1))
-        hours = int(total_seconds // 3600)
-        minutes = int((total_seconds % 3600) // 60)
-        seconds = int(total_seconds % 60)
-        millis = int((total_seconds - int(total_seconds)) * 1000)
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d},{millis:03d}"
-    
-    return timestamp
+    # Format: time in seconds (float), split at the dot so the milliseconds are
+    # exact instead of going through floating point
+    whole, _, fraction = time_match.group('sec').partition('.')
+    minutes, seconds = divmod(int(whole), 60)
+    hours, minutes = divmod(minutes, 60)
+    millis = int(fraction.ljust(3, '0')[:3])
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{millis:03d}"
 
 def convert_special_txt_format(input_file, output_file):
     """
     Convert TXT files with a specific format where timestamps like "0:00:01.000,0:00:07.160" 
     are on their own lines followed by caption text.
     """
-    # Read the file content, handling BOM and special characters
+    # Sniff the BOM to pick the encoding, handling special characters
     with open(input_file, 'rb') as f:
-        content = f.read()
+        content = f.read(4)
     
     # Try to detect encoding
-    encoding = 'utf-8'
-    if content.startswith(b'\xef\xbb\xbf'):  # UTF-8 BOM
-        encoding = 'utf-8-sig'
-    elif content.startswith(b'\xff\xfe') or content.startswith(b'\xfe\xff'):  # UTF-16 BOM
-        encoding = 'utf-16'
+    encoding = next((enc for bom, enc in _BOMS if content.startswith(bom)), 'utf-8')
     
-    # Decode the content with the detected encoding
-    try:
-        text = content.decode(encoding, errors='ignore')
-    except UnicodeDecodeError:
-        # Fallback to latin-1 which should handle any byte value
-        text = content.decode('latin-1', errors='ignore')
-    
-    # Split into lines and process
-    lines = text.splitlines()
-    
-    srt_content = []
     counter = 1
-    i = 0
     
-    while i < len(lines):
-        line = lines[i].strip()
+    # Decode the content with the detected encoding as it is read
+    with open(input_file, 'r', encoding=encoding, errors='ignore') as f, \
+         _atomic_output(output_file) as out:
+        reader = _LineReader(f)
         
-        # Skip empty lines
-        if not line:
-            i += 1
-            continue
-        
-        # Look for timestamp pattern like "0:00:01.000,0:00:07.160"
-        # More flexible matching to handle special characters
-        timestamp_match = re.search(r'(\d+:\d+:\d+\.\d+),(\d+:\d+:\d+\.\d+)', line)
-        
-        if timestamp_match:
-            start_time = timestamp_match.group(1)
-            end_time = timestamp_match.group(2)
-            
-            # Convert to SRT format (HH:MM:SS,mmm)
-            start_time = start_time.replace('.', ',')
-            end_time = end_time.replace('.', ',')
+        for line in reader:
+            # Skip empty lines
+            if not line:
+                continue
             
-            # Ensure proper hour formatting (0:00:00 -> 00:00:00)
-            if start_time.count(':') == 2 and start_time[0] == '0' and not start_time.startswith('00'):
-                start_time = '0' + start_time
-            if end_time.count(':') == 2 and end_time[0] == '0' and not end_time.startswith('00'):
-                end_time = '0' + end_time
+            # Look for timestamp pattern like "0:00:01.000,0:00:07.160"
+            # More flexible matching to handle special characters
+            timestamp_match = _TS_SBV_PARTS.search(line)
             
-            # Get the subtitle text (collect until next timestamp or empty line)
-            subtitle_lines = []
-            i += 1
-            while i < len(lines) and lines[i].strip() and not re.search(r'\d+:\d+:\d+\.\d+,\d+:\d+:\d+\.\d+', lines[i].strip()):
-                subtitle_lines.append(lines[i].strip())
-                i += 1
-            
-            if subtitle_lines:
-                srt_content.append(f"{counter}")
-                srt_content.append(f"{start_time} --> {end_time}")
-                srt_content.extend(subtitle_lines)
-                srt_content.append("")
-                counter += 1
-            else:
-                i += 1
-        else:
-            i += 1
+            if timestamp_match:
+                # Convert to SRT format (HH:MM:SS,mmm), zero-padding only the hour
+                start_h, start_rest, start_ms, end_h, end_rest, end_ms = timestamp_match.groups()
+                start_time = f"{start_h.zfill(2)}{start_rest},{start_ms}"
+                end_time = f"{end_h.zfill(2)}{end_rest},{end_ms}"
+                
+                # Get the subtitle text (collect until next timestamp or empty line)
+                subtitle_lines = _read_cue_text(reader, _TS_SBV_PARTS.search)
+                
+                if subtitle_lines:
+                    text = '\n'.join(subtitle_lines)
+                    out.write(f"{counter}\n{start_time} --> {end_time}\n{text}\n\n")
+                    counter += 1
+                else:
+                    next(reader, None)
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(srt_content))
+    return counter - 1
+
+# Converter for each caption format, keyed by extension
+_DISPATCH = {
+    '.rtf': convert_rtf_to_srt,
+    '.txt': convert_txt_to_srt,
+    '.vtt': convert_vtt_to_srt,
+    '.xml': convert_xml_to_srt,
+    '.sbv': convert_sbv_to_srt,
+}
+
+# Converters tried in turn when the one for the detected format fails
+_FALLBACK_ORDER = (
+    ('TXT converter', convert_txt_to_srt),
+    ('VTT converter', convert_vtt_to_srt),
+    ('SBV converter', convert_sbv_to_srt),
+    ('RTF converter', convert_rtf_to_srt),
+)
+
+def _prefetch(input_files):
+    """Ask the kernel to start reading all input files in the background"""
+    # posix_fadvise is only available on Linux and some other Unix systems
+    if not hasattr(os, 'posix_fadvise'):
+        return
     
-    return True
+    for input_file in input_files:
+        try:
+            fd = os.open(input_file, os.O_RDONLY)
+        except OSError:
+            continue  # convert_to_srt reports missing files
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+def map_files(function, input_files, *iterables, workers=None):
+    """Call function on each input file (and matching items of iterables) in worker processes"""
+    input_files = list(input_files)
+    workers = workers or os.cpu_count() or 1
+    
+    # For larger batches, queue the reads of every file up front so the workers
+    # find them in the page cache instead of each blocking on its own read
+    if len(input_files) >= 8:
+        _prefetch(input_files)
+    
+    # Each chunk goes to a single worker, so size the chunks to give every worker
+    # several of them; the results are returned in the order of input_files
+    chunksize = max(1, len(input_files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, input_files, *iterables, chunksize=chunksize))
+
+def convert_many(input_files, workers=None):
+    """Convert several caption files to SRT in parallel, one worker process per CPU by default"""
+    return map_files(convert_to_srt, input_files, workers=workers)
 
 def main():
     """Main entry point"""
@@ -4,50 +4,90 @@
 import os
 import sys
 import shutil
-from any2srt import convert_to_srt
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from any2srt import convert_to_srt, map_files
+
+_SUPPORTED_EXTS = frozenset({'.rtf', '.txt', '.vtt', '.xml', '.sbv', '.srt'})
 
 def is_srt_valid(srt_file):
     """Check if SRT file is valid by verifying it has content and proper structure"""
     try:
         with open(srt_file, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read().strip()
+            # The first subtitle entry is at the top of the file, so only the
+            # start of it needs to be read
+            content = f.read(4096).strip()
             
             # Check if file is empty
             if not content:
                 return False
             
             # Check if file has at least one subtitle entry (number, timestamp, text)
-            lines = content.split('\n')
-            if len(lines) < 3:
+            if content.count('\n') < 2:
                 return False
                 
-            # Basic check for SRT structure (should have numbers and timestamps)
-            has_timestamp = False
-            for line in lines:
-                if '-->' in line:
-                    has_timestamp = True
-                    break
-            
-            return has_timestamp
+            # Basic check for SRT structure (should have timestamps)
+            return '-->' in content
     except Exception:
         return False
 
+def _copy_srt(file_path, success_dir):
+    """Copy a file that is already in SRT format to success_dir"""
+    filename = os.path.basename(file_path)
+    dest_path = os.path.join(success_dir, filename)
+    shutil.copy2(file_path, dest_path)
+    print(f"Copied SRT file: {filename}")
+
+def _convert_one(file_path, output_filename, success_dir, problem_dir):
+    """Convert one caption file, copying it to problem_dir if the conversion fails"""
+    filename = os.path.basename(file_path)
+    output_path = os.path.join(success_dir, output_filename)
+    
+    try:
+        print(f"Converting {filename}...")
+        result = convert_to_srt(file_path, output_path)
+        
+        # Check if conversion was successful and SRT file is valid
+        if result and is_srt_valid(output_path):
+            print(f"Successfully converted: {filename} -> {output_filename}")
+            return True
+        
+        print(f"Conversion failed or produced empty file: {filename}")
+        # Move the original file to the problem directory
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        problem_file_path = os.path.join(problem_dir, filename)
+        shutil.copy2(file_path, problem_file_path)
+        return False
+    except Exception as e:
+        print(f"Error converting {filename}: {str(e)}")
+        # Move the original file to the problem directory
+        problem_file_path = os.path.join(problem_dir, filename)
+        shutil.copy2(file_path, problem_file_path)
+        return False
+
 def batch_convert_captions(input_dir, success_dir, problem_dir):
     """Convert all caption files in input_dir to SRT format"""
     os.makedirs(success_dir, exist_ok=True)
     os.makedirs(problem_dir, exist_ok=True)
     
-    supported_extensions = ['.rtf', '.txt', '.vtt', '.xml', '.sbv', '.srt']
-    
     successful = 0
     problematic = 0
     skipped = 0
+    to_copy = []
+    to_convert = []
+    output_filenames = []
     
-    for filename in os.listdir(input_dir):
-        file_path = os.path.join(input_dir, filename)
+    # scandir caches the entry type, so checking for directories needs no extra stat
+    with os.scandir(input_dir) as entries:
+        entries = list(entries)
+    
+    for entry in entries:
+        filename = entry.name
+        file_path = entry.path
         
         # Skip directories
-        if os.path.isdir(file_path):
+        if entry.is_dir():
             continue
         
         # Skip hidden files
@@ -56,49 +96,39 @@ def batch_convert_captions(input_dir, success_dir, problem_dir):
             continue
         
         # Get file extension
-        _, ext = os.path.splitext(filename)
+        base, ext = os.path.splitext(filename)
         ext = ext.lower()
         
         # Skip unsupported file types
-        if ext not in supported_extensions:
+        if ext not in _SUPPORTED_EXTS:
             print(f"Skipping unsupported file: {filename}")
             skipped += 1
             continue
         
         # If it's already an SRT file, just copy it to success directory
         if ext == '.srt':
-            dest_path = os.path.join(success_dir, filename)
-            shutil.copy2(file_path, dest_path)
-            print(f"Copied SRT file: {filename}")
-            successful += 1
+            to_copy.append(file_path)
             continue
         
-        # For other file types, attempt conversion
-        output_filename = os.path.splitext(filename)[0] + '.srt'
-        output_path = os.path.join(success_dir, output_filename)
+        # Other file types are converted in parallel once all files are listed
+        to_convert.append(file_path)
+        output_filenames.append(base + '.srt')
+    
+    # Conversions are CPU-bound and independent, so run them in worker processes.
+    # Copying SRT files is pure I/O, so it runs in threads at the same time.
+    with ThreadPoolExecutor(max_workers=16) as copier:
+        copies = [copier.submit(_copy_srt, file_path, success_dir) for file_path in to_copy]
         
-        try:
-            print(f"Converting {filename}...")
-            result = convert_to_srt(file_path, output_path)
-            
-            # Check if conversion was successful and SRT file is valid
-            if result and is_srt_valid(output_path):
-                print(f"Successfully converted: {filename} -> {output_filename}")
+        convert_one = partial(_convert_one, success_dir=success_dir, problem_dir=problem_dir)
+        for converted in map_files(convert_one, to_convert, output_filenames):
+            if converted:
                 successful += 1
             else:
-                print(f"Conversion failed or produced empty file: {filename}")
-                # Move the original file to the problem directory
-                if os.path.exists(output_path):
-                    os.remove(output_path)
-                problem_file_path = os.path.join(problem_dir, filename)
-                shutil.copy2(file_path, problem_file_path)
                 problematic += 1
-        except Exception as e:
-            print(f"Error converting {filename}: {str(e)}")
-            # Move the original file to the problem directory
-            problem_file_path = os.path.join(problem_dir, filename)
-            shutil.copy2(file_path, problem_file_path)
-            problematic += 1
+        
+        for copy in copies:
+            copy.result()
+            successful += 1
     
     return successful, problematic, skipped
 